@@ -2,32 +2,98 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import re
 import subprocess
-from dataclasses import dataclass
+import sys
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-
-
-@dataclass
+from typing import IO
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+_CONV_PREFIX_RE = re.compile(r"^(feat|fix|docs|refactor|test|chore)(?:\((?P<scope>[^)]*)\))?!?:\s*", re.IGNORECASE)
+_SCOPE_RE = re.compile(r"^[a-z]+\(([^)]+)\)!?:", re.IGNORECASE)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_WS_RE = re.compile(r"\s+")
+# ASCII fast path for _canonical_item: lowercase letters, drop backticks, keep
+# digits/whitespace, and turn any other character into a space
+_ASCII_CANON_TABLE = {
+    code: None if ch == "`" else ch.lower() if ch.isalnum() or ch.isspace() else " "
+    for code, ch in enumerate(map(chr, range(128)))
+}
+_LOW_SIGNAL_DOCS_RE = re.compile(r"devlog|release notes|changelog")
+_LOW_SIGNAL_CHORE_RE = re.compile(r"release|version|bump deps|bump dependencies|dependency|changelog")
+
+_GIT_READ_CHUNK = 64 * 1024
+
+# first three letters uniquely identify each conventional-commit type
+_TYPE_BY_PREFIX = {"fea": "feat", "fix": "fix", "doc": "docs", "ref": "refactor", "tes": "test", "cho": "chore"}
+_ALLOWED_TYPES = frozenset({"feat", "fix", "docs", "refactor", "test", "chore", "other"})
+_VALID_GROUP_BY = frozenset({"type", "scope"})
+_VALID_PRESETS = frozenset({"short", "standard"})
+_VALID_DESTINATIONS = frozenset({"release", "update", "social", "internal"})
+_BUCKET_ORDER = ("features", "fixes", "docs", "other")
+
+
+@dataclass(slots=True)
 class Commit:
     sha: str
     subject: str
+    # derived from subject once at construction; read by filter/render passes
+    ctype: str = field(init=False, repr=False, compare=False)
+    scope: str = field(init=False, repr=False, compare=False)
+    bucket: str = field(init=False, repr=False, compare=False)
+    normalized: str = field(init=False, repr=False, compare=False)
+    canonical: str = field(init=False, repr=False, compare=False)
+    low_signal: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        (
+            self.ctype,
+            self.scope,
+            self.bucket,
+            self.normalized,
+            self.canonical,
+            self.low_signal,
+        ) = _parse_subject(self.subject)
+
+
+def _git_env() -> dict[str, str]:
+    # git translates its messages; pin them to English so the stderr checks
+    # below (e.g. "not a git repository") hold under any user locale
+    return {**os.environ, "LC_ALL": "C", "LANGUAGE": ""}
 
 
-def _run_git(path: Path, args: list[str]) -> subprocess.CompletedProcess[str]:
-    return subprocess.run(["git", *args], cwd=str(path), capture_output=True, text=True)
+def _run_git(path: Path, args: list[str]) -> subprocess.CompletedProcess[bytes]:
+    return subprocess.run(["git", *args], cwd=str(path), capture_output=True, env=_git_env())
 
 
-def _is_git_repo(path: Path) -> bool:
-    proc = _run_git(path, ["rev-parse", "--is-inside-work-tree"])
-    return proc.returncode == 0 and proc.stdout.strip() == "true"
+def _popen_git(path: Path, args: list[str], *, stderr: IO[bytes]) -> subprocess.Popen[bytes]:
+    # stderr goes to a file, not a second pipe: git could fill a stderr pipe while
+    # stdout is still being read and both processes would block on each other
+    return subprocess.Popen(["git", *args], cwd=str(path), stdout=subprocess.PIPE, stderr=stderr, env=_git_env())
+
+
+def _check_git_repo(path: Path, stderr: bytes) -> None:
+    # no up-front `rev-parse` probe: map git's own failure to the friendly error
+    if b"not a git repository" in stderr.lower():
+        raise ValueError(f"Not a git repository: {path}")
 
 
 def _latest_tag(path: Path) -> str | None:
     proc = _run_git(path, ["describe", "--tags", "--abbrev=0"])
     if proc.returncode != 0:
+        # fail here instead of spawning `git log` just to hit the same error
+        _check_git_repo(path, proc.stderr)
         return None
-    out = proc.stdout.strip()
+    out = proc.stdout.strip().decode("utf-8", "replace")
     return out or None
 
 
@@ -49,97 +115,139 @@ def resolve_range(path: Path, *, since_tag: str | None, since_commit: str | None
     return "", target, target
 
 
+def _iter_log_fields(proc: subprocess.Popen[bytes], width: int) -> Iterator[list[bytes]]:
+    # -z output is a flat "f1\0f2\0f1\0f2" stream of `width`-field records; yield
+    # the complete fields of each read and carry the unfinished record over
+    pending = b""
+    while chunk := proc.stdout.read1(_GIT_READ_CHUNK):
+        fields = (pending + chunk).split(b"\x00")
+        # the last field is partial, and so is any record it belongs to
+        keep = 1 + (len(fields) - 1) % width
+        pending = b"\x00".join(fields[-keep:])
+        del fields[-keep:]
+        yield fields
+    if pending:
+        # last record has no trailing separator
+        yield pending.split(b"\x00")
+
+
+def _raise_log_error(path: Path, proc: subprocess.Popen[bytes], stderr: IO[bytes]) -> None:
+    if proc.wait() != 0:
+        stderr.seek(0)
+        err = stderr.read().strip()
+        _check_git_repo(path, err)
+        raise ValueError(f"Could not read git history: {err.decode('utf-8', 'replace') or 'git log failed'}")
+
+
 def collect_commits(path: Path, *, range_spec: str) -> list[Commit]:
-    args = ["log", "--pretty=format:%H\t%s"]
+    args = ["log", "--pretty=format:%H%x00%s", "-z"]
     if range_spec:
         args.append(range_spec)
 
-    proc = _run_git(path, args)
-    if proc.returncode != 0:
-        err = proc.stderr.strip() or proc.stdout.strip() or "git log failed"
-        raise ValueError(f"Could not read git history: {err}")
-
     commits: list[Commit] = []
-    for line in proc.stdout.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        parts = line.split("\t", 1)
-        if len(parts) != 2:
-            continue
-        commits.append(Commit(sha=parts[0], subject=parts[1]))
+    with tempfile.TemporaryFile() as stderr, _popen_git(path, args, stderr=stderr) as proc:
+        for fields in _iter_log_fields(proc, 2):
+            commits += [
+                Commit(sha=sha.decode("ascii"), subject=subject.decode("utf-8", "replace"))
+                for sha, subject in zip(fields[0::2], fields[1::2])
+            ]
+        _raise_log_error(path, proc, stderr)
     return commits
 
 
+def _collect_since_latest_tag(path: Path) -> tuple[str, list[Commit]] | None:
+    # single `git log HEAD` pass that stops at the first tagged commit; None when a
+    # merge or multi-tag commit comes first (only `describe` picks the same tag there)
+    args = ["log", "--pretty=format:%H%x00%P%x00%D%x00%s", "-z", "--decorate-refs=refs/tags/", "HEAD"]
+
+    commits: list[Commit] = []
+    with tempfile.TemporaryFile() as stderr, _popen_git(path, args, stderr=stderr) as proc:
+        for fields in _iter_log_fields(proc, 4):
+            for sha, parents, refs, subject in zip(fields[0::4], fields[1::4], fields[2::4], fields[3::4]):
+                if refs:
+                    tags = [ref[5:] for ref in refs.split(b", ") if ref.startswith(b"tag: ")]
+                    if len(tags) > 1:
+                        return None
+                    if tags:
+                        # leaving the block closes the pipe and git exits early
+                        return tags[0].decode("utf-8", "replace"), commits
+                if b" " in parents:
+                    return None
+                commits.append(Commit(sha=sha.decode("ascii"), subject=subject.decode("utf-8", "replace")))
+        _raise_log_error(path, proc, stderr)
+    return "", commits
+
+
+def _resolve_and_collect(
+    path: Path, *, since_tag: str | None, since_commit: str | None
+) -> tuple[str, str, str, list[Commit]]:
+    if not since_tag and not since_commit:
+        found = _collect_since_latest_tag(path)
+        if found is not None:
+            base_ref, commits = found
+            return base_ref, "HEAD", f"{base_ref}..HEAD" if base_ref else "HEAD", commits
+
+    base_ref, target_ref, range_spec = resolve_range(path, since_tag=since_tag, since_commit=since_commit)
+    return base_ref, target_ref, range_spec, collect_commits(path, range_spec=range_spec)
+
+
 def extract_changelog_items(path: Path, *, max_items: int = 6) -> list[str]:
     changelog = path / "CHANGELOG.md"
     if not changelog.exists():
         return []
 
-    lines = changelog.read_text(encoding="utf-8").splitlines()
-
-    start_idx: int | None = None
-    end_idx = len(lines)
-
-    for i, line in enumerate(lines):
-        if line.strip().startswith("## "):
-            start_idx = i + 1
-            break
-
-    if start_idx is not None:
-        for j in range(start_idx, len(lines)):
-            if lines[j].strip().startswith("## "):
-                end_idx = j
-                break
-        scan = lines[start_idx:end_idx]
-    else:
-        scan = lines
-
+    # stream lines and stop at the end of the first "## " section (or once it
+    # yields max_items); bullets before any heading only count when there is none.
+    # Lines are matched as bytes and only headings and bullets get decoded.
     out: list[str] = []
-    for line in scan:
-        if not line.startswith("- "):
-            continue
-        item = line[2:].strip()
-        if not item:
-            continue
-        out.append(item)
-        if len(out) >= max_items:
-            break
+    in_section = False
+    with changelog.open("rb") as f:
+        for raw in f:
+            if b"## " in raw and raw.decode("utf-8").strip().startswith("## "):
+                if in_section:
+                    break
+                in_section = True
+                out = []
+                continue
+            if not raw.startswith(b"- ") or len(out) >= max_items:
+                continue
+            item = raw[2:].decode("utf-8").strip()
+            if not item:
+                continue
+            out.append(item)
+            if in_section and len(out) >= max_items:
+                break
 
     return out
 
 
-def _normalize_subject(subject: str) -> str:
-    normalized = re.sub(r"^(feat|fix|docs|refactor|test|chore)(\([^)]*\))?!?:\s*", "", subject, flags=re.IGNORECASE)
-    normalized = normalized.strip()
-    return normalized or subject
-
-
+@lru_cache(maxsize=4096)
 def _canonical_item(text: str) -> str:
+    if text.isascii():
+        # same result as the regex path below, in one table-driven pass
+        return " ".join(text.translate(_ASCII_CANON_TABLE).split())
     normalized = text.lower().replace("`", "")
-    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
-    normalized = re.sub(r"\s+", " ", normalized).strip()
+    normalized = _NON_ALNUM_RE.sub(" ", normalized)
+    normalized = _WS_RE.sub(" ", normalized).strip()
     return normalized
 
 
-def _commit_type(subject: str) -> str:
-    lower = subject.lower()
-    for kind in ("feat", "fix", "docs", "refactor", "test", "chore"):
-        if lower.startswith(kind):
-            return kind
+def _commit_type(lowered: str) -> str:
+    kind = _TYPE_BY_PREFIX.get(lowered[:3])
+    if kind and lowered.startswith(kind):
+        return kind
     return "other"
 
 
 def _commit_scope(subject: str) -> str:
-    m = re.match(r"^[a-z]+\(([^)]+)\)!?:", subject.strip(), flags=re.IGNORECASE)
+    m = _SCOPE_RE.match(subject.strip())
     if not m:
         return "general"
     scope = m.group(1).strip().lower()
     return scope or "general"
 
 
-def _bucket_for_subject(subject: str) -> str:
-    commit_type = _commit_type(subject)
+def _bucket_for_type(commit_type: str) -> str:
     if commit_type == "feat":
         return "features"
     if commit_type == "fix":
@@ -149,6 +257,30 @@ def _bucket_for_subject(subject: str) -> str:
     return "other"
 
 
+@lru_cache(maxsize=4096)
+def _parse_subject(subject: str) -> tuple[str, str, str, str, str, bool]:
+    # repeated subjects (reverts, squashes, "fix typo") share one parse
+    lowered = subject.lower()
+    ctype = _commit_type(lowered)
+    m = _CONV_PREFIX_RE.match(subject) if ctype != "other" else None
+    if m:
+        # one match yields both the scope and the text after the prefix
+        scope = (m.group("scope") or "").strip().lower() or "general"
+        normalized = subject[m.end() :].strip() or subject
+    else:
+        # nothing to strip, but a scope may still be present (e.g. "perf(api): ...")
+        scope = _commit_scope(subject)
+        normalized = subject.strip() or subject
+    return (
+        ctype,
+        scope,
+        _bucket_for_type(ctype),
+        normalized,
+        _canonical_item(normalized),
+        _is_low_signal_subject(lowered),
+    )
+
+
 def filter_commits(
     commits: list[Commit],
     *,
@@ -157,51 +289,33 @@ def filter_commits(
     include_scopes: set[str] | None,
     exclude_scopes: set[str] | None,
 ) -> list[Commit]:
-    include = include_types or set()
-    exclude = exclude_types or set()
-    include_scope_set = {s.lower() for s in (include_scopes or set())}
-    exclude_scope_set = {s.lower() for s in (exclude_scopes or set())}
-
-    out: list[Commit] = []
-    for c in commits:
-        ctype = _commit_type(c.subject)
-        scope = _commit_scope(c.subject)
-        if include and ctype not in include:
-            continue
-        if ctype in exclude:
-            continue
-        if include_scope_set and scope not in include_scope_set:
-            continue
-        if scope in exclude_scope_set:
-            continue
-        out.append(c)
-    return out
+    if not (include_types or exclude_types or include_scopes or exclude_scopes):
+        return list(commits)
 
+    # fold include/exclude into one allowed set per dimension; None means "any scope"
+    allowed_types = frozenset(include_types or _ALLOWED_TYPES) - frozenset(exclude_types or ())
+    exclude_scope_set = {s.lower() for s in (exclude_scopes or ())}
+    allowed_scopes = {s.lower() for s in include_scopes} - exclude_scope_set if include_scopes else None
 
-def _is_low_signal_subject(subject: str) -> bool:
-    s = subject.strip().lower()
+    if allowed_scopes is None:
+        return [c for c in commits if c.ctype in allowed_types and c.scope not in exclude_scope_set]
+    return [c for c in commits if c.ctype in allowed_types and c.scope in allowed_scopes]
+
+
+def _is_low_signal_subject(lowered: str) -> bool:
+    s = lowered.strip()
 
     if s.startswith("docs:"):
-        return any(token in s for token in ("devlog", "release notes", "changelog"))
+        return _LOW_SIGNAL_DOCS_RE.search(s) is not None
 
     if s.startswith("chore:"):
-        return any(
-            token in s
-            for token in (
-                "release",
-                "version",
-                "bump deps",
-                "bump dependencies",
-                "dependency",
-                "changelog",
-            )
-        )
+        return _LOW_SIGNAL_CHORE_RE.search(s) is not None
 
     return False
 
 
 def filter_low_signal_commits(commits: list[Commit]) -> list[Commit]:
-    return [c for c in commits if not _is_low_signal_subject(c.subject)]
+    return [c for c in commits if not c.low_signal]
 
 
 def _default_title_template(*, preset: str, destination: str) -> str:
@@ -246,6 +360,10 @@ def _build_why_lines(
     return lines
 
 
+def _commit_item(c: Commit) -> dict[str, object]:
+    return {"source": "commit", "text": c.normalized, "sha": c.sha, "type": c.ctype, "scope": c.scope}
+
+
 def _build_render_data(
     *,
     repo_name: str,
@@ -262,60 +380,75 @@ def _build_render_data(
     include_why: bool,
     max_bullets: int,
 ) -> dict[str, object]:
-    bullet_rows: list[tuple[str, str]] = []  # (line, source) where source in {commit,changelog,header}
+    # (line, item) where item is the structured entry for the row, or None for scope headers
+    bullet_rows: list[tuple[str, dict[str, object] | None]] = []
     seen_items: set[str] = set()
 
     if commits:
         if group_by == "scope":
-            grouped_scope: dict[str, list[str]] = {}
+            grouped_scope: dict[str, list[Commit]] = {}
             for c in commits:
-                scope = _commit_scope(c.subject)
-                grouped_scope.setdefault(scope, []).append(_normalize_subject(c.subject))
+                grouped_scope.setdefault(c.scope, []).append(c)
 
             for scope in sorted(grouped_scope.keys()):
-                scope_items: list[str] = []
-                for item in grouped_scope[scope]:
-                    canon = _canonical_item(item)
-                    if not canon or canon in seen_items:
+                room = max_bullets - len(bullet_rows) - 1  # rows left after this scope's header
+                if room < 0:
+                    break
+                scope_commits: list[Commit] = []
+                for c in grouped_scope[scope]:
+                    if not c.canonical or c.canonical in seen_items:
                         continue
-                    seen_items.add(canon)
-                    scope_items.append(item)
+                    seen_items.add(c.canonical)
+                    scope_commits.append(c)
+                    if len(scope_commits) > room:
+                        break
 
-                if not scope_items:
+                if not scope_commits:
                     continue
 
-                bullet_rows.append((f"- [{scope}]", "header"))
-                for item in scope_items:
-                    bullet_rows.append((f"  - {item}", "commit"))
+                bullet_rows.append((f"- [{scope}]", None))
+                for c in scope_commits:
+                    bullet_rows.append((f"  - {c.normalized}", _commit_item(c)))
         else:
-            grouped: dict[str, list[str]] = {"features": [], "fixes": [], "docs": [], "other": []}
+            # one pass: bucket + in-bucket dedup (first occurrence wins);
+            # cross-bucket dedup happens at emission so earlier buckets keep precedence
+            grouped: dict[str, dict[str, Commit]] = {key: {} for key in _BUCKET_ORDER}
             for c in commits:
-                grouped[_bucket_for_subject(c.subject)].append(_normalize_subject(c.subject))
-
-            for key in ("features", "fixes", "docs", "other"):
-                for item in grouped[key]:
-                    canon = _canonical_item(item)
-                    if not canon or canon in seen_items:
+                if c.canonical:
+                    grouped[c.bucket].setdefault(c.canonical, c)
+
+            for key in _BUCKET_ORDER:
+                if len(bullet_rows) >= max_bullets:
+                    break
+                for canon, c in grouped[key].items():
+                    if canon in seen_items:
                         continue
                     seen_items.add(canon)
-                    bullet_rows.append((f"- {item}", "commit"))
+                    bullet_rows.append((f"- {c.normalized}", _commit_item(c)))
+                    if len(bullet_rows) >= max_bullets:
+                        break
 
     for item in changelog_items:
+        if len(bullet_rows) >= max_bullets:
+            break
         canon = _canonical_item(item)
         if not canon or canon in seen_items:
             continue
         seen_items.add(canon)
-        bullet_rows.append((f"- {item}", "changelog"))
+        bullet_rows.append((f"- {item}", {"source": "changelog", "text": item}))
 
     selected_rows = bullet_rows[:max_bullets]
     selected_lines = [line for line, _ in selected_rows]
-    commit_items_used = sum(1 for _, src in selected_rows if src == "commit")
-    changelog_items_used = sum(1 for _, src in selected_rows if src == "changelog")
+    selected_items = [item for _, item in selected_rows if item is not None]
+    commit_items_used = sum(1 for item in selected_items if item["source"] == "commit")
+    changelog_items_used = len(selected_items) - commit_items_used
 
     if selected_lines:
         what_shipped_lines = selected_lines
     else:
-        what_shipped_lines = ["- No commits or changelog bullets found for selected range."]
+        placeholder = "No commits or changelog bullets found for selected range."
+        what_shipped_lines = [f"- {placeholder}"]
+        selected_items = [{"source": "derived", "text": placeholder}]
 
     why_lines = _build_why_lines(
         base_ref=base_ref,
@@ -344,6 +477,7 @@ def _build_render_data(
         "include_validation": include_validation,
         "include_links": include_links,
         "links": links,
+        "items": selected_items,
         "stats": {
             "commit_items_used": commit_items_used,
             "changelog_items_used": changelog_items_used,
@@ -357,14 +491,14 @@ def _render_markdown_from_data(data: dict[str, object]) -> str:
         str(data["title"]),
         "",
         "## What shipped",
-        "\n".join(data["what_shipped_lines"]),
+        *data["what_shipped_lines"],
         "",
     ]
 
     if bool(data.get("include_why", True)):
         out.extend([
             "## Why it matters",
-            "\n".join(data["why_lines"]),
+            *data["why_lines"],
             "",
         ])
 
@@ -386,64 +520,6 @@ def _render_markdown_from_data(data: dict[str, object]) -> str:
     return "\n".join(out)
 
 
-def _line_to_item_text(line: str) -> str | None:
-    s = line.strip()
-    if not s.startswith("-"):
-        return None
-    text = s[1:].strip()
-    if not text:
-        return None
-    if text.startswith("[") and text.endswith("]"):
-        return None
-    return text
-
-
-def _build_structured_items(
-    *,
-    what_shipped_lines: list[str],
-    commits: list[Commit],
-    changelog_items: list[str],
-) -> list[dict[str, object]]:
-    commit_lookup: dict[str, dict[str, object]] = {}
-    for c in commits:
-        normalized = _normalize_subject(c.subject)
-        key = _canonical_item(normalized)
-        if key and key not in commit_lookup:
-            commit_lookup[key] = {
-                "source": "commit",
-                "text": normalized,
-                "sha": c.sha,
-                "type": _commit_type(c.subject),
-                "scope": _commit_scope(c.subject),
-            }
-
-    changelog_lookup: dict[str, str] = {}
-    for item in changelog_items:
-        key = _canonical_item(item)
-        if key and key not in changelog_lookup:
-            changelog_lookup[key] = item
-
-    out: list[dict[str, object]] = []
-    seen_keys: set[str] = set()
-    for line in what_shipped_lines:
-        text = _line_to_item_text(line)
-        if not text:
-            continue
-        key = _canonical_item(text)
-        if not key or key in seen_keys:
-            continue
-        seen_keys.add(key)
-
-        if key in commit_lookup:
-            out.append(commit_lookup[key])
-        elif key in changelog_lookup:
-            out.append({"source": "changelog", "text": changelog_lookup[key]})
-        else:
-            out.append({"source": "derived", "text": text})
-
-    return out
-
-
 def build_structured_payload(
     *,
     schema_version: str,
@@ -484,15 +560,23 @@ def build_structured_payload(
             "why_it_matters": (render_data["why_lines"] if bool(render_data.get("include_why", True)) else []),
             "links": render_data["links"],
         },
-        "items": _build_structured_items(
-            what_shipped_lines=list(render_data["what_shipped_lines"]),
-            commits=commits,
-            changelog_items=changelog_items,
-        ),
+        "items": render_data["items"],
         "markdown": markdown,
     }
 
 
+def _dump_json(payload: dict[str, object]) -> bytes:
+    # both backends emit identical bytes: sorted keys, 2-space indent, raw UTF-8
+    try:
+        if orjson is not None:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        return json.dumps(payload, indent=2, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    except (TypeError, UnicodeEncodeError):  # orjson.JSONEncodeError is a TypeError
+        # lone surrogates (non-UTF-8 paths or argv) have no raw UTF-8 form; \u-escape
+        # everything instead, and let genuinely unserializable payloads raise from here
+        return json.dumps(payload, indent=2, sort_keys=True).encode("ascii")
+
+
 def render_draft(
     *,
     repo_name: str,
@@ -526,23 +610,30 @@ def render_draft(
     return _render_markdown_from_data(data)
 
 
+def _write_stdout(data: bytes) -> None:
+    stream = getattr(sys.stdout, "buffer", None)
+    if stream is None:
+        # text-only replacement stream (e.g. io.StringIO)
+        sys.stdout.write(data.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    stream.write(data)
+    stream.flush()
+
+
 def cmd_draft(args: argparse.Namespace) -> int:
     repo_path = Path(args.path).resolve()
-    if not _is_git_repo(repo_path):
-        raise ValueError(f"Not a git repository: {repo_path}")
 
-    base_ref, target_ref, range_spec = resolve_range(
+    base_ref, target_ref, range_spec, commits = _resolve_and_collect(
         repo_path,
         since_tag=args.since_tag,
         since_commit=args.since_commit,
     )
-    commits = collect_commits(repo_path, range_spec=range_spec)
     raw_commit_count = len(commits)
 
     include_types = set(args.include_type or [])
     exclude_types = set(args.exclude_type or [])
-    allowed_types = {"feat", "fix", "docs", "refactor", "test", "chore", "other"}
-    unknown = sorted((include_types | exclude_types) - allowed_types)
+    unknown = sorted((include_types | exclude_types) - _ALLOWED_TYPES)
     if unknown:
         raise ValueError(f"Unknown commit types: {', '.join(unknown)}")
 
@@ -555,15 +646,15 @@ def cmd_draft(args: argparse.Namespace) -> int:
     )
 
     group_by = args.group_by or "type"
-    if group_by not in {"type", "scope"}:
+    if group_by not in _VALID_GROUP_BY:
         raise ValueError("group_by must be one of: type, scope")
 
     preset = args.preset or "standard"
-    if preset not in {"short", "standard"}:
+    if preset not in _VALID_PRESETS:
         raise ValueError("preset must be one of: short, standard")
 
     destination = getattr(args, "destination", None) or "release"
-    if destination not in {"release", "update", "social", "internal"}:
+    if destination not in _VALID_DESTINATIONS:
         raise ValueError("destination must be one of: release, update, social, internal")
 
     default_title_template = _default_title_template(preset=preset, destination=destination)
@@ -633,20 +724,20 @@ def cmd_draft(args: argparse.Namespace) -> int:
             render_data=render_data,
             markdown=markdown,
         )
-        output_text = json.dumps(payload, indent=2, sort_keys=True)
+        output_bytes = _dump_json(payload) + b"\n"
     else:
-        output_text = markdown
+        output_bytes = markdown.encode("utf-8")
 
     if args.output:
         out_path = Path(args.output)
         if not out_path.is_absolute():
             out_path = repo_path / out_path
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(output_text + ("\n" if json_output else ""), encoding="utf-8")
+        out_path.write_bytes(output_bytes)
         print(f"Wrote draft: {out_path}")
         return 0
 
-    print(output_text, end="" if not json_output else "\n")
+    _write_stdout(output_bytes)
     return 0
 
 
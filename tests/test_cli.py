@@ -2,9 +2,17 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import shutil
 import subprocess
+import sys
+from collections.abc import Iterator
 from pathlib import Path
+from types import MappingProxyType
 
+import pytest
+
+from ship_note import cli
 from ship_note.cli import (
     Commit,
     cmd_draft,
@@ -18,35 +26,164 @@ from ship_note.cli import (
 
 
 def _run(cmd: list[str], cwd: Path) -> None:
-    subprocess.run(cmd, cwd=str(cwd), check=True, capture_output=True, text=True)
+    proc = subprocess.run(cmd, cwd=str(cwd), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise AssertionError(f"{' '.join(cmd)} failed: {proc.stderr.decode('utf-8', 'replace')}")
+
+
+_CHANGELOG_BODY = (
+    "# Changelog\n"
+    "\n"
+    "## [0.2.0]\n"
+    "- Added new parser\n"
+    "  - nested detail should be ignored\n"
+    "- Added docs\n"
+    "\n"
+    "## [0.1.0]\n"
+    "- Added draft command\n"
+    "- Added tests\n"
+)
+_EXPECTED_ITEMS = ("Added new parser", "Added docs")
+
+# a release section that low-signal-only ranges should not pull into short drafts
+_STALE_CHANGELOG_BODY = "# Changelog\n\n## [0.2.0]\n- Added parser improvements\n"
+
+# parser defaults for the `draft` subcommand; tests override only what they exercise
+_DEFAULT_DRAFT_ARGS = MappingProxyType(
+    {
+        "since_tag": None,
+        "since_commit": None,
+        "repo_url": None,
+        "release_url": None,
+        "include_type": None,
+        "exclude_type": None,
+        "include_scope": None,
+        "exclude_scope": None,
+        "preset": "standard",
+        "destination": "release",
+        "group_by": "type",
+        "title_template": None,
+        "no_validation": False,
+        "no_links": False,
+        "with_why": False,
+        "keep_low_signal": False,
+        "max_bullets": None,
+        "max_changelog_items": None,
+        "json": False,
+        "output": None,
+    }
+)
 
 
-def _init_repo(path: Path) -> None:
-    _run(["git", "init", "-b", "main"], path)
-    _run(["git", "config", "user.name", "Test"], path)
-    _run(["git", "config", "user.email", "test@example.com"], path)
+def _draft_args(**overrides: object) -> argparse.Namespace:
+    return argparse.Namespace(**{**_DEFAULT_DRAFT_ARGS, **overrides})
 
 
-def _write(path: Path, rel: str, content: str) -> None:
-    full = path / rel
-    full.parent.mkdir(parents=True, exist_ok=True)
-    full.write_text(content, encoding="utf-8")
+# keep user/system git config out of every git the tests start, including ship-note's own;
+# the locale is left alone so tests see the messages ship-note's own git calls produce
+_GIT_ENV = {
+    "GIT_CONFIG_NOSYSTEM": "1",
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_TERMINAL_PROMPT": "0",
+}
 
 
-def _commit_all(path: Path, msg: str) -> None:
-    _run(["git", "add", "-A"], path)
-    _run(["git", "commit", "-m", msg], path)
+@pytest.fixture(scope="session", autouse=True)
+def _isolated_git_env() -> Iterator[None]:
+    with pytest.MonkeyPatch.context() as mp:
+        for key, value in _GIT_ENV.items():
+            mp.setenv(key, value)
+        yield
 
 
-def test_resolve_range_defaults_to_last_tag(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _commit_all(repo, "feat: init")
-    _run(["git", "tag", "v0.1.0"], repo)
-    _write(repo, "src/a.txt", "x\n")
-    _commit_all(repo, "fix: patch")
+@pytest.fixture(scope="session")
+def _template_repo(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("template")
+    _run(["git", "init", "-b", "main"], path)
+    return path
+
+
+@pytest.fixture
+def repo(tmp_path: Path, _template_repo: Path) -> Path:
+    # copying an initialized repo is cheaper than running `git init` per test
+    path = tmp_path / "repo"
+    shutil.copytree(_template_repo, path)
+    return path
+
+
+def _write(path: Path, rel: str, content: str) -> None:
+    full = path / rel
+    if "/" in rel:
+        full.parent.mkdir(parents=True, exist_ok=True)
+    # bytes, so the worktree copy matches the blob fast-import stores on every platform
+    full.write_bytes(content.encode("utf-8"))
+
+
+def _data(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    return b"data %d\n%s\n" % (len(raw), raw)
+
+
+class _FastImportRepo:
+    """Streams a test repo's setup commits and tags through one `git fast-import`.
+
+    Committed files are also written to the worktree so CHANGELOG.md is readable.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._mark = 0
+        self._proc = subprocess.Popen(
+            ["git", "fast-import", "--quiet", "--date-format=now"],
+            cwd=str(path),
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def __enter__(self) -> _FastImportRepo:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _, err = self._proc.communicate()
+        if self._proc.returncode != 0 and exc_type is None:
+            raise AssertionError(f"git fast-import failed: {err.decode('utf-8', 'replace')}")
+
+    def commit(
+        self,
+        msg: str,
+        files: dict[str, str],
+        *,
+        branch: str = "main",
+        parent: str | None = None,
+        merge: str | None = None,
+    ) -> str:
+        self._mark += 1
+        mark = f":{self._mark}"
+        record = [
+            f"commit refs/heads/{branch}\nmark {mark}\ncommitter Test <test@example.com> now\n".encode(),
+            _data(msg),
+        ]
+        if parent:
+            record.append(f"from {parent}\n".encode())
+        if merge:
+            record.append(f"merge {merge}\n".encode())
+        for rel, content in files.items():
+            _write(self.path, rel, content)
+            record.append(f"M 100644 inline {rel}\n".encode())
+            record.append(_data(content))
+        self._proc.stdin.write(b"".join(record))
+        return mark
+
+    def tag(self, name: str, target: str | None = None) -> None:
+        self._proc.stdin.write(f"reset refs/tags/{name}\nfrom {target or f':{self._mark}'}\n\n".encode())
+
+
+@pytest.mark.integration
+def test_resolve_range_defaults_to_last_tag(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: init", {"README.md": "x\n"})
+        git.tag("v0.1.0")
+        git.commit("fix: patch", {"src/a.txt": "x\n"})
 
     base, target, range_spec = resolve_range(repo, since_tag=None, since_commit=None)
     assert base == "v0.1.0"
@@ -54,14 +191,55 @@ def test_resolve_range_defaults_to_last_tag(tmp_path: Path):
     assert range_spec == "v0.1.0..HEAD"
 
 
-def test_collect_commits_and_render(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _commit_all(repo, "feat: add command")
-    _write(repo, "README.md", "y\n")
-    _commit_all(repo, "fix: patch bug")
+@pytest.mark.integration
+def test_default_range_single_pass_matches_describe(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: init", {"README.md": "x\n"})
+        git.tag("v0.1.0")
+        git.commit("fix: patch", {"src/a.txt": "x\n"})
+
+    def expected() -> tuple[str, str, str, list[str]]:
+        base, target, range_spec = resolve_range(repo, since_tag=None, since_commit=None)
+        return base, target, range_spec, [c.sha for c in collect_commits(repo, range_spec=range_spec)]
+
+    def actual() -> tuple[str, str, str, list[str]]:
+        base, target, range_spec, commits = cli._resolve_and_collect(repo, since_tag=None, since_commit=None)
+        return base, target, range_spec, [c.sha for c in commits]
+
+    assert actual() == expected()
+    assert actual()[0] == "v0.1.0"
+
+    # a merge before the tag falls back to describe + log
+    with _FastImportRepo(repo) as git:
+        side = git.commit("docs: side note", {"src/b.txt": "x\n"}, branch="side", parent="v0.1.0^0")
+        git.commit("chore: merge side", {}, parent="main^0", merge=side)
+    assert actual() == expected()
+    assert len(actual()[3]) == 3
+
+
+@pytest.mark.integration
+def test_default_range_falls_back_when_tagged_commit_has_several_tags(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: init", {"README.md": "x\n"})
+        git.tag("v0.1.0")
+        git.tag("v0.1.0-final")
+        git.commit("fix: patch", {"src/a.txt": "x\n"})
+
+    assert cli._collect_since_latest_tag(repo) is None
+
+    base, target, range_spec, commits = cli._resolve_and_collect(repo, since_tag=None, since_commit=None)
+    expected_base, expected_target, expected_range = resolve_range(repo, since_tag=None, since_commit=None)
+    assert (base, target, range_spec) == (expected_base, expected_target, expected_range)
+    assert base in {"v0.1.0", "v0.1.0-final"}
+    assert [c.sha for c in commits] == [c.sha for c in collect_commits(repo, range_spec=expected_range)]
+    assert [c.subject for c in commits] == ["fix: patch"]
+
+
+@pytest.mark.integration
+def test_collect_commits_and_render(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: add command", {"README.md": "x\n"})
+        git.commit("fix: patch bug", {"README.md": "y\n"})
 
     commits = collect_commits(repo, range_spec="HEAD~1..HEAD")
     assert len(commits) == 1
@@ -88,12 +266,45 @@ def test_collect_commits_and_render(tmp_path: Path):
     assert "https://example.com/repo" in draft
 
 
-def test_resolve_range_rejects_both_flags(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _commit_all(repo, "chore: init")
+@pytest.mark.integration
+def test_collect_commits_parses_records_split_across_reads(repo: Path, monkeypatch):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: add command", {"README.md": "x\n"})
+        git.commit("fix: patch bug", {"README.md": "y\n"})
+
+    monkeypatch.setattr(cli, "_GIT_READ_CHUNK", 7)
+    commits = collect_commits(repo, range_spec="")
+    assert [c.subject for c in commits] == ["fix: patch bug", "feat: add command"]
+    assert all(len(c.sha) == 40 for c in commits)
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(sys.platform == "win32", reason="fake git is a shebang script")
+def test_collect_commits_survives_stderr_larger_than_a_pipe(tmp_path: Path, monkeypatch):
+    # a git that floods stderr before writing any stdout deadlocks a reader that only
+    # drains stderr after stdout hits EOF
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_git = bin_dir / "git"
+    fake_git.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "sys.stderr.write('warning: ignoring broken ref\\n' * 20000)\n"
+        "sys.stderr.flush()\n"
+        "sys.stdout.write('a' * 40 + '\\0fix: patch bug')\n",
+        encoding="utf-8",
+    )
+    fake_git.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    commits = collect_commits(tmp_path, range_spec="")
+    assert [c.subject for c in commits] == ["fix: patch bug"]
+
+
+@pytest.mark.integration
+def test_resolve_range_rejects_both_flags(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("chore: init", {"README.md": "x\n"})
 
     try:
         resolve_range(repo, since_tag="v0.1.0", since_commit="abc123")
@@ -103,46 +314,36 @@ def test_resolve_range_rejects_both_flags(tmp_path: Path):
         raise AssertionError("Expected ValueError")
 
 
+@pytest.mark.unit
 def test_extract_changelog_items(tmp_path: Path):
     repo = tmp_path / "repo"
     repo.mkdir()
-    _write(
-        repo,
-        "CHANGELOG.md",
-        "# Changelog\n\n## [0.2.0]\n- Added new parser\n  - nested detail should be ignored\n- Added docs\n\n## [0.1.0]\n- Added draft command\n- Added tests\n",
-    )
-    items = extract_changelog_items(repo)
-    assert items == ["Added new parser", "Added docs"]
+    _write(repo, "CHANGELOG.md", _CHANGELOG_BODY)
+    assert tuple(extract_changelog_items(repo)) == _EXPECTED_ITEMS
 
 
-def test_cmd_draft_writes_output_file(tmp_path: Path):
+@pytest.mark.unit
+def test_extract_changelog_items_ignores_older_sections_bytes(tmp_path: Path):
     repo = tmp_path / "repo"
     repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _write(repo, "CHANGELOG.md", "# Changelog\n\n- Added draft support\n")
-    _commit_all(repo, "feat: init")
-
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag=None,
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="standard",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        output="out/devlog.md",
+    (repo / "CHANGELOG.md").write_bytes(
+        b"# Changelog\r\n\r\n## [0.2.0]\r\n- Added parser\r\n\r\n## [0.1.0]\r\n- Legacy \xff entry\r\n"
     )
+    assert extract_changelog_items(repo) == ["Added parser"]
+
+
+@pytest.mark.integration
+def test_cmd_draft_writes_output_file(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit(
+            "feat: init",
+            {
+                "README.md": "x\n",
+                "CHANGELOG.md": "# Changelog\n\n- Added draft support\n",
+            },
+        )
+
+    args = _draft_args(path=str(repo), output="out/devlog.md")
     rc = cmd_draft(args)
     assert rc == 0
     out = repo / "out" / "devlog.md"
@@ -152,181 +353,119 @@ def test_cmd_draft_writes_output_file(tmp_path: Path):
     assert "Added draft support" in text
 
 
-def test_cmd_draft_short_preset_omits_validation_and_uses_short_title(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _commit_all(repo, "feat: init")
+@pytest.mark.integration
+def test_cmd_draft_prints_markdown_to_stdout(repo: Path, capsys):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: add caf\u00e9 mode", {"README.md": "x\n"})
 
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag=None,
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="short",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        output="out/short.md",
-    )
+    args = _draft_args(path=str(repo))
     rc = cmd_draft(args)
     assert rc == 0
-    text = (repo / "out" / "short.md").read_text(encoding="utf-8")
-    assert "# repo update" in text
-    assert "## Validation" not in text
-
-
-def test_cmd_draft_short_drops_low_signal_when_changelog_exists(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _write(repo, "CHANGELOG.md", "# Changelog\n\n## [0.2.0]\n- Added parser improvements\n")
-    _commit_all(repo, "docs: publish v0.1.0 devlog")
-
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag=None,
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="short",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        output="out/short.md",
-    )
+    out = capsys.readouterr().out
+    assert out.startswith("# repo devlog draft\n")
+    assert "- add caf\u00e9 mode" in out
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    ("subject", "changelog", "expected_in", "expected_not_in"),
+    [
+        pytest.param(
+            "feat: init",
+            None,
+            ["# repo update"],
+            ["## Validation"],
+            id="omits-validation-and-uses-short-title",
+        ),
+        pytest.param(
+            "docs: publish v0.1.0 devlog",
+            _STALE_CHANGELOG_BODY,
+            ["No commits or changelog bullets found"],
+            ["Added parser improvements", "publish v0.1.0 devlog"],
+            id="drops-low-signal-when-changelog-exists",
+        ),
+        pytest.param(
+            "docs: publish v0.1.0 devlog",
+            None,
+            ["publish v0.1.0 devlog"],
+            [],
+            id="keeps-low-signal-when-no-changelog",
+        ),
+        pytest.param(
+            "chore: bump dependencies",
+            _STALE_CHANGELOG_BODY,
+            ["No commits or changelog bullets found"],
+            ["bump dependencies", "Added parser improvements"],
+            id="filters-dependency-chore-with-stale-changelog",
+        ),
+    ],
+)
+def test_cmd_draft_short_preset(
+    repo: Path, subject: str, changelog: str | None, expected_in: list[str], expected_not_in: list[str]
+):
+    files = {"README.md": "x\n"}
+    if changelog is not None:
+        files["CHANGELOG.md"] = changelog
+    with _FastImportRepo(repo) as git:
+        git.commit(subject, files)
+
+    args = _draft_args(path=str(repo), preset="short", output="out/short.md")
     rc = cmd_draft(args)
     assert rc == 0
     text = (repo / "out" / "short.md").read_text(encoding="utf-8")
-    assert "Added parser improvements" not in text
-    assert "publish v0.1.0 devlog" not in text
-    assert "No commits or changelog bullets found" in text
-
-
-def test_cmd_draft_short_keeps_low_signal_when_no_changelog(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _commit_all(repo, "docs: publish v0.1.0 devlog")
-
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag=None,
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="short",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        output="out/short.md",
-    )
+    for expected in expected_in:
+        assert expected in text
+    for unexpected in expected_not_in:
+        assert unexpected not in text
+
+
+@pytest.mark.integration
+def test_cmd_draft_drops_changelog_when_range_has_no_commits(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit(
+            "feat: init",
+            {
+                "README.md": "x\n",
+                "CHANGELOG.md": "# Changelog\n\n## [0.1.0]\n- Added major feature\n",
+            },
+        )
+        git.tag("v0.1.0")
+
+    args = _draft_args(path=str(repo), since_tag="v0.1.0", preset="short", output="out/short.md")
     rc = cmd_draft(args)
     assert rc == 0
     text = (repo / "out" / "short.md").read_text(encoding="utf-8")
-    assert "publish v0.1.0 devlog" in text
+    assert "Added major feature" not in text
+    assert "No commits or changelog bullets found" in text
 
 
-def test_cmd_draft_short_filters_dependency_chore_with_stale_changelog(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _write(repo, "CHANGELOG.md", "# Changelog\n\n## [0.2.0]\n- Added parser improvements\n")
-    _commit_all(repo, "chore: bump dependencies")
+@pytest.mark.integration
+def test_cmd_draft_rejects_non_git_directory(tmp_path: Path):
+    plain = tmp_path / "plain"
+    plain.mkdir()
 
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag=None,
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="short",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        output="out/short.md",
-    )
-    rc = cmd_draft(args)
-    assert rc == 0
-    text = (repo / "out" / "short.md").read_text(encoding="utf-8")
-    assert "bump dependencies" not in text
-    assert "Added parser improvements" not in text
-    assert "No commits or changelog bullets found" in text
+    args = _draft_args(path=str(plain))
+    try:
+        cmd_draft(args)
+    except ValueError as e:
+        assert "not a git repository" in str(e).lower()
+    else:
+        raise AssertionError("Expected ValueError")
 
 
-def test_cmd_draft_drops_changelog_when_range_has_no_commits(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _write(repo, "CHANGELOG.md", "# Changelog\n\n## [0.1.0]\n- Added major feature\n")
-    _commit_all(repo, "feat: init")
-    _run(["git", "tag", "v0.1.0"], repo)
+@pytest.mark.integration
+def test_cmd_draft_rejects_non_git_directory_under_translated_locale(tmp_path: Path, monkeypatch):
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    # git ships a German catalog; without a pinned locale its stderr reads "Kein Git-Repository"
+    monkeypatch.setenv("LANGUAGE", "de")
+    monkeypatch.setenv("LC_ALL", "C.UTF-8")
 
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag="v0.1.0",
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="short",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        output="out/short.md",
-    )
-    rc = cmd_draft(args)
-    assert rc == 0
-    text = (repo / "out" / "short.md").read_text(encoding="utf-8")
-    assert "Added major feature" not in text
-    assert "No commits or changelog bullets found" in text
+    with pytest.raises(ValueError, match="^Not a git repository: "):
+        cmd_draft(_draft_args(path=str(plain)))
 
 
+@pytest.mark.unit
 def test_filter_low_signal_commits_drops_release_admin_noise():
     commits = [
         Commit(sha="1", subject="feat: add parser"),
@@ -339,6 +478,7 @@ def test_filter_low_signal_commits_drops_release_admin_noise():
     assert [c.sha for c in filtered] == ["1"]
 
 
+@pytest.mark.unit
 def test_filter_commits_include_exclude_types():
     commits = [
         Commit(sha="1", subject="feat: add CLI"),
@@ -365,6 +505,7 @@ def test_filter_commits_include_exclude_types():
     assert [c.sha for c in no_docs] == ["1", "2"]
 
 
+@pytest.mark.unit
 def test_filter_commits_include_exclude_scopes():
     commits = [
         Commit(sha="1", subject="feat(api): add endpoint"),
@@ -391,6 +532,7 @@ def test_filter_commits_include_exclude_scopes():
     assert [c.sha for c in no_general] == ["1", "2"]
 
 
+@pytest.mark.unit
 def test_render_draft_dedupes_changelog_items_against_commits():
     commits = [Commit(sha="1", subject="feat: add parser")]
     draft = render_draft(
@@ -411,6 +553,7 @@ def test_render_draft_dedupes_changelog_items_against_commits():
     assert "- Added docs" in draft
 
 
+@pytest.mark.unit
 def test_render_draft_group_by_scope_and_toggle_sections():
     commits = [
         Commit(sha="1", subject="feat(api): add endpoint"),
@@ -438,6 +581,7 @@ def test_render_draft_group_by_scope_and_toggle_sections():
     assert "## Links" not in draft
 
 
+@pytest.mark.unit
 def test_render_draft_respects_max_bullets_cap():
     commits = [
         Commit(sha="1", subject="feat: add one"),
@@ -463,33 +607,22 @@ def test_render_draft_respects_max_bullets_cap():
     assert len(bullet_lines) == 2
 
 
-def test_cmd_draft_json_emits_structured_payload(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _write(repo, "CHANGELOG.md", "# Changelog\n\n## [0.1.0]\n- Added parser\n")
-    _commit_all(repo, "feat: add parser")
+@pytest.mark.integration
+def test_cmd_draft_json_emits_structured_payload(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit(
+            "feat: add parser",
+            {
+                "README.md": "x\n",
+                "CHANGELOG.md": "# Changelog\n\n## [0.1.0]\n- Added parser\n",
+            },
+        )
 
-    args = argparse.Namespace(
+    args = _draft_args(
         path=str(repo),
-        since_tag=None,
-        since_commit=None,
         repo_url="https://example.com/repo",
         release_url="https://example.com/release/v0.1.0",
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="standard",
         destination="social",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
         json=True,
         output="out/draft.json",
     )
@@ -507,6 +640,45 @@ def test_cmd_draft_json_emits_structured_payload(tmp_path: Path):
     assert "markdown" in payload and "## What shipped" in payload["markdown"]
 
 
+@pytest.mark.integration
+@pytest.mark.skipif(sys.platform in ("win32", "darwin"), reason="needs a filesystem that accepts non-UTF-8 names")
+@pytest.mark.parametrize("backend", ["orjson", "stdlib"])
+def test_cmd_draft_json_escapes_non_utf8_repo_name(tmp_path: Path, _template_repo: Path, monkeypatch, backend: str):
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(cli, "orjson", None)
+    repo = tmp_path / os.fsdecode(b"bad\xffname")
+    shutil.copytree(_template_repo, repo)
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: add parser", {"README.md": "x\n"})
+
+    rc = cmd_draft(_draft_args(path=str(repo), json=True, output="out/draft.json"))
+    assert rc == 0
+
+    raw = (repo / "out" / "draft.json").read_bytes()
+    assert b'"name": "bad\\udcffname"' in raw
+    assert json.loads(raw)["repo"]["name"] == "bad\udcffname"
+
+
+@pytest.mark.integration
+def test_cmd_draft_json_items_follow_rendered_bullets(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("fix: add parser", {"README.md": "x\n"})
+        git.commit("feat: add parser", {"README.md": "y\n"})
+
+    args = _draft_args(path=str(repo), json=True, output="out/draft.json")
+
+    rc = cmd_draft(args)
+    assert rc == 0
+
+    payload = json.loads((repo / "out" / "draft.json").read_text(encoding="utf-8"))
+    # the feature bucket renders first, so the bullet (and its item) come from the feat commit
+    assert payload["sections"]["what_shipped"] == ["- add parser"]
+    assert [(i["source"], i["type"]) for i in payload["items"]] == [("commit", "feat")]
+
+
+@pytest.mark.unit
 def test_render_draft_why_section_is_not_placeholder_wording():
     draft = render_draft(
         repo_name="demo",
@@ -526,36 +698,12 @@ def test_render_draft_why_section_is_not_placeholder_wording():
     assert "Covers `v0.1.0..v0.1.1`" in draft
 
 
-def test_cmd_draft_omits_why_by_default(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _commit_all(repo, "feat: add parser")
+@pytest.mark.integration
+def test_cmd_draft_omits_why_by_default(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: add parser", {"README.md": "x\n"})
 
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag=None,
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="standard",
-        destination="release",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        with_why=False,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        json=False,
-        output="out/draft.md",
-    )
+    args = _draft_args(path=str(repo), output="out/draft.md")
     rc = cmd_draft(args)
     assert rc == 0
 
@@ -563,38 +711,25 @@ def test_cmd_draft_omits_why_by_default(tmp_path: Path):
     assert "## Why it matters" not in text
 
 
-def test_cmd_draft_with_why_includes_section(tmp_path: Path):
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _init_repo(repo)
-    _write(repo, "README.md", "x\n")
-    _commit_all(repo, "feat: add parser")
+@pytest.mark.integration
+def test_cmd_draft_with_why_includes_section(repo: Path):
+    with _FastImportRepo(repo) as git:
+        git.commit("feat: add parser", {"README.md": "x\n"})
 
-    args = argparse.Namespace(
-        path=str(repo),
-        since_tag=None,
-        since_commit=None,
-        repo_url=None,
-        release_url=None,
-        include_type=None,
-        exclude_type=None,
-        include_scope=None,
-        exclude_scope=None,
-        preset="standard",
-        destination="internal",
-        group_by="type",
-        title_template=None,
-        no_validation=False,
-        no_links=False,
-        with_why=True,
-        keep_low_signal=False,
-        max_bullets=None,
-        max_changelog_items=None,
-        json=False,
-        output="out/draft.md",
-    )
+    args = _draft_args(path=str(repo), destination="internal", with_why=True, output="out/draft.md")
     rc = cmd_draft(args)
     assert rc == 0
 
     text = (repo / "out" / "draft.md").read_text(encoding="utf-8")
     assert "## Why it matters" in text
+
+
+@pytest.mark.unit
+def test_dump_json_matches_stdlib_output(monkeypatch):
+    pytest.importorskip("orjson")
+    payload = {"b": [], "a": {"text": "caf\u00e9 \"quoted\"\n", "n": None, "count": 3}, "items": [{"sha": "1"}]}
+
+    fast = cli._dump_json(payload)
+    monkeypatch.setattr(cli, "orjson", None)
+    assert cli._dump_json(payload) == fast
+    assert json.loads(fast) == payload
@@ -1,2 +1,7 @@
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
 def test_smoke():
     assert True
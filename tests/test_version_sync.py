@@ -1,12 +1,41 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
-import tomllib
+
+import pytest
 
 from ship_note import __version__
 
+pytestmark = pytest.mark.unit
+
+# only the [project] table: other tables (e.g. [tool.*]) may carry their own `version` key
+_PROJECT_TABLE_RE = re.compile(rb"(?ms)^\[project\][^\n]*\n(.*?)(?=^\[|\Z)")
+_VERSION_RE = re.compile(rb'(?m)^version\s*=\s*"([^"]+)"')
+
+
+def _pyproject_version(path: Path) -> str:
+    data = path.read_bytes()
+    table = _PROJECT_TABLE_RE.search(data)
+    match = _VERSION_RE.search(table.group(1)) if table else None
+    if match:
+        return match.group(1).decode("ascii")
+    # unusual layouts (inline tables, single quotes) still go through a real TOML parse
+    import tomllib
+
+    return tomllib.loads(data.decode("utf-8"))["project"]["version"]
+
 
 def test_pyproject_version_matches_package_version():
     root = Path(__file__).resolve().parents[1]
-    data = tomllib.loads((root / "pyproject.toml").read_text(encoding="utf-8"))
-    assert data["project"]["version"] == __version__
+    assert _pyproject_version(root / "pyproject.toml") == __version__
+
+
+def test_pyproject_version_ignores_other_tables(tmp_path: Path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        '[tool.bumpver]\nversion = "9.9.9"\n\n[project]\nname = "demo"\nversion = "1.2.3"\n\n'
+        '[tool.other]\nversion = "0.0.0"\n',
+        encoding="utf-8",
+    )
+    assert _pyproject_version(pyproject) == "1.2.3"